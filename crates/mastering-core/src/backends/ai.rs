@@ -1,9 +1,8 @@
 use anyhow::{Context, Result};
 use serde::{Deserialize, Serialize};
-use std::process::Command;
 use tracing::{debug, info};
 
-use super::{BackendOutput, MasteringOptions};
+use super::{worker, BackendOutput, MasteringOptions};
 use crate::analysis;
 use crate::config::Config;
 use crate::types::{AiProvider, MasteringParams};
@@ -86,21 +85,10 @@ impl AiBackend {
             "bit_depth": opts.bit_depth,
         });
 
-        let output = Command::new(&self.python_path)
-            .arg(&script)
-            .arg(request.to_string())
-            .output()
-            .with_context(|| {
-                format!(
-                    "Failed to run DSP bridge. Is Python installed at '{}'?",
-                    self.python_path
-                )
-            })?;
-
-        if !output.status.success() {
-            let stderr = String::from_utf8_lossy(&output.stderr);
-            anyhow::bail!("DSP processing failed:\n{stderr}");
-        }
+        let response = worker::call(&self.python_path, &script, request)
+            .await
+            .map_err(|e| anyhow::anyhow!("DSP processing failed:\n{e:#}"))?;
+        debug!("DSP bridge response: {response}");
 
         info!("AI-assisted mastering completed");
 
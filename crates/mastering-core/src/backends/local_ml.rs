@@ -1,8 +1,8 @@
-use anyhow::{Context, Result};
+use anyhow::Result;
 use std::process::Command;
 use tracing::{debug, info};
 
-use super::{BackendOutput, MasteringOptions};
+use super::{worker, BackendOutput, MasteringOptions};
 use crate::config::Config;
 
 #[derive(Debug, Clone)]
@@ -44,30 +44,11 @@ impl LocalMlBackend {
             "target_lufs": opts.target_lufs,
         });
 
-        let output = Command::new(&self.python_path)
-            .arg(&script)
-            .arg(request.to_string())
-            .output()
-            .with_context(|| {
-                format!(
-                    "Failed to run ML inference script. Is Python installed at '{}'?",
-                    self.python_path
-                )
-            })?;
+        let response = worker::call(&self.python_path, &script, request)
+            .await
+            .map_err(|e| anyhow::anyhow!("ML inference failed:\n{e:#}"))?;
 
-        debug!(
-            "ML inference stdout: {}",
-            String::from_utf8_lossy(&output.stdout)
-        );
-
-        if !output.status.success() {
-            let stderr = String::from_utf8_lossy(&output.stderr);
-            anyhow::bail!("ML inference failed:\n{stderr}");
-        }
-
-        let stdout = String::from_utf8_lossy(&output.stdout);
-        let response: serde_json::Value = serde_json::from_str(stdout.trim())
-            .with_context(|| format!("Parsing ML inference output: {stdout}"))?;
+        debug!("ML inference response: {response}");
 
         let result_path = response["output"]
             .as_str()
@@ -2,7 +2,7 @@ use anyhow::{Context, Result};
 use std::process::Command;
 use tracing::{debug, info};
 
-use super::{BackendOutput, MasteringOptions};
+use super::{worker, BackendOutput, MasteringOptions};
 use crate::config::Config;
 
 #[derive(Debug, Clone)]
@@ -46,27 +46,11 @@ impl MatcheringBackend {
             "no_limiter": opts.no_limiter,
         });
 
-        let output = Command::new(&self.python_path)
-            .arg(&script)
-            .arg(request.to_string())
-            .output()
-            .with_context(|| {
-                format!(
-                    "Failed to run matchering bridge script. Is Python installed at '{}'?",
-                    self.python_path
-                )
-            })?;
+        let response = worker::call(&self.python_path, &script, request)
+            .await
+            .map_err(|e| anyhow::anyhow!("Matchering failed:\n{e:#}"))?;
 
-        debug!("Matchering stdout: {}", String::from_utf8_lossy(&output.stdout));
-
-        if !output.status.success() {
-            let stderr = String::from_utf8_lossy(&output.stderr);
-            anyhow::bail!("Matchering failed:\n{stderr}");
-        }
-
-        let stdout = String::from_utf8_lossy(&output.stdout);
-        let response: serde_json::Value = serde_json::from_str(stdout.trim())
-            .with_context(|| format!("Parsing matchering output: {stdout}"))?;
+        debug!("Matchering response: {response}");
 
         let result_path = response["output"]
             .as_str()
@@ -1,6 +1,7 @@
 pub mod ai;
 pub mod local_ml;
 pub mod matchering;
+pub mod worker;
 
 use anyhow::Result;
 use std::path::PathBuf;
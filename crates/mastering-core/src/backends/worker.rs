@@ -0,0 +1,242 @@
+//! Persistent Python bridge workers.
+//!
+//! Each bridge script is started once with `--server` and then answers
+//! newline-delimited JSON requests over stdin/stdout, so interpreter start-up
+//! and the pedalboard/torch/matchering imports are paid once per process
+//! instead of once per job. Workers are keyed by interpreter and script; jobs
+//! sent to the same worker run one at a time.
+//!
+//! A worker's stderr (warnings, fallback notices, tracebacks) is forwarded to
+//! `tracing`, and its last lines are attached to the error if the worker dies.
+
+use anyhow::{Context, Result};
+use std::collections::{HashMap, VecDeque};
+use std::io::{BufRead, BufReader, Write};
+use std::path::{Path, PathBuf};
+use std::process::{Child, ChildStdin, ChildStdout, Command, Stdio};
+use std::sync::{Arc, Mutex, OnceLock};
+use std::thread::JoinHandle;
+use tracing::{debug, info, warn};
+
+/// Lines of a worker's stderr kept for the error report when it dies
+const STDERR_TAIL_LINES: usize = 20;
+
+type WorkerKey = (String, PathBuf);
+type SharedWorker = Arc<Mutex<Worker>>;
+
+static WORKERS: OnceLock<Mutex<HashMap<WorkerKey, SharedWorker>>> = OnceLock::new();
+
+struct Worker {
+    child: Child,
+    stdin: ChildStdin,
+    stdout: BufReader<ChildStdout>,
+    stderr_tail: Arc<Mutex<VecDeque<String>>>,
+    stderr_reader: Option<JoinHandle<()>>,
+}
+
+impl Worker {
+    fn spawn(python: &str, script: &Path) -> Result<Self> {
+        debug!("Starting Python worker: {python} {} --server", script.display());
+
+        let mut child = Command::new(python)
+            .arg(script)
+            .arg("--server")
+            .stdin(Stdio::piped())
+            .stdout(Stdio::piped())
+            .stderr(Stdio::piped())
+            .spawn()
+            .with_context(|| {
+                format!(
+                    "Failed to start {}. Is Python installed at '{python}'?",
+                    script.display()
+                )
+            })?;
+
+        let stdin = child.stdin.take().context("Python worker has no stdin")?;
+        let stdout = child.stdout.take().context("Python worker has no stdout")?;
+        let stderr = child.stderr.take().context("Python worker has no stderr")?;
+
+        // Drain stderr continuously so the worker never blocks on a full pipe
+        let stderr_tail = Arc::new(Mutex::new(VecDeque::with_capacity(STDERR_TAIL_LINES)));
+        let tail = Arc::clone(&stderr_tail);
+        let name = script
+            .file_name()
+            .map(|n| n.to_string_lossy().into_owned())
+            .unwrap_or_default();
+        let stderr_reader = std::thread::spawn(move || {
+            for line in BufReader::new(stderr).lines() {
+                let Ok(line) = line else { break };
+                info!("[{name}] {line}");
+                if let Ok(mut tail) = tail.lock() {
+                    if tail.len() == STDERR_TAIL_LINES {
+                        tail.pop_front();
+                    }
+                    tail.push_back(line);
+                }
+            }
+        });
+
+        Ok(Self {
+            child,
+            stdin,
+            stdout: BufReader::new(stdout),
+            stderr_tail,
+            stderr_reader: Some(stderr_reader),
+        })
+    }
+
+    fn call(&mut self, request: &serde_json::Value) -> Result<serde_json::Value> {
+        // A write only fails once the worker has gone away
+        if writeln!(self.stdin, "{request}")
+            .and_then(|_| self.stdin.flush())
+            .is_err()
+        {
+            return Err(self.exit_error());
+        }
+
+        let mut line = String::new();
+        let read = self
+            .stdout
+            .read_line(&mut line)
+            .context("Reading from Python worker")?;
+        if read == 0 {
+            return Err(self.exit_error());
+        }
+
+        serde_json::from_str(line.trim())
+            .with_context(|| format!("Parsing Python worker output: {line}"))
+    }
+}
+
+impl Worker {
+    /// Reap a worker that stopped answering and report the end of its stderr.
+    fn exit_error(&mut self) -> anyhow::Error {
+        let _ = self.child.kill();
+        let _ = self.child.wait();
+        // The reader finishes once the pipe is closed, so the tail is complete
+        if let Some(reader) = self.stderr_reader.take() {
+            let _ = reader.join();
+        }
+
+        let tail = self
+            .stderr_tail
+            .lock()
+            .map(|tail| Vec::from(tail.clone()).join("\n"))
+            .unwrap_or_default();
+        if tail.is_empty() {
+            anyhow::anyhow!("Python worker exited unexpectedly")
+        } else {
+            anyhow::anyhow!("Python worker exited unexpectedly:\n{tail}")
+        }
+    }
+}
+
+impl Drop for Worker {
+    fn drop(&mut self) {
+        let _ = self.child.kill();
+        let _ = self.child.wait();
+    }
+}
+
+/// Send one JSON request to the persistent worker running `script`, starting
+/// it on first use. A response carrying an `"error"` field becomes an `Err`.
+pub async fn call(
+    python: &str,
+    script: &Path,
+    request: serde_json::Value,
+) -> Result<serde_json::Value> {
+    let python = python.to_string();
+    let script = script.to_path_buf();
+
+    tokio::task::spawn_blocking(move || call_blocking(&python, &script, &request))
+        .await
+        .context("Python worker task failed")?
+}
+
+fn call_blocking(
+    python: &str,
+    script: &Path,
+    request: &serde_json::Value,
+) -> Result<serde_json::Value> {
+    let worker = get_or_spawn(python, script)?;
+
+    let result = worker
+        .lock()
+        .map_err(|_| anyhow::anyhow!("Python worker lock poisoned"))?
+        .call(request);
+
+    let response = match result {
+        Ok(response) => response,
+        Err(e) => {
+            // The worker died or lost sync; the next call starts a fresh one
+            warn!("Python worker {} failed: {e:#}", script.display());
+            evict(python, script, &worker);
+            return Err(e);
+        }
+    };
+
+    if let Some(message) = response.get("error").and_then(|e| e.as_str()) {
+        anyhow::bail!("{message}");
+    }
+
+    Ok(response)
+}
+
+fn get_or_spawn(python: &str, script: &Path) -> Result<SharedWorker> {
+    let mut workers = WORKERS
+        .get_or_init(Default::default)
+        .lock()
+        .map_err(|_| anyhow::anyhow!("Python worker pool lock poisoned"))?;
+
+    let key = (python.to_string(), script.to_path_buf());
+    if let Some(worker) = workers.get(&key) {
+        return Ok(Arc::clone(worker));
+    }
+
+    let worker = Arc::new(Mutex::new(Worker::spawn(python, script)?));
+    workers.insert(key, Arc::clone(&worker));
+    Ok(worker)
+}
+
+fn evict(python: &str, script: &Path, worker: &SharedWorker) {
+    if let Some(pool) = WORKERS.get() {
+        if let Ok(mut workers) = pool.lock() {
+            let key = (python.to_string(), script.to_path_buf());
+            if workers.get(&key).is_some_and(|w| Arc::ptr_eq(w, worker)) {
+                workers.remove(&key);
+            }
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[tokio::test]
+    async fn test_call_missing_interpreter() {
+        let result = call(
+            "definitely-not-a-python-interpreter",
+            Path::new("apply_fx.py"),
+            serde_json::json!({}),
+        )
+        .await;
+
+        let err = result.unwrap_err().to_string();
+        assert!(err.contains("Is Python installed"), "unexpected error: {err}");
+    }
+
+    #[cfg(unix)]
+    #[tokio::test]
+    async fn test_call_reports_worker_stderr() {
+        let script = std::env::temp_dir().join(format!("worker-crash-{}.sh", std::process::id()));
+        std::fs::write(&script, "echo 'Traceback: import failed' >&2\nexit 1\n").unwrap();
+
+        let result = call("sh", &script, serde_json::json!({})).await;
+        let _ = std::fs::remove_file(&script);
+
+        let err = result.unwrap_err().to_string();
+        assert!(err.contains("exited unexpectedly"), "unexpected error: {err}");
+        assert!(err.contains("Traceback: import failed"), "unexpected error: {err}");
+    }
+}
@@ -0,0 +1,176 @@
+"""
+Numba kernels for the per-sample loops in the DSP bridge.
+Each kernel has a plain numpy equivalent used when numba isn't installed.
+The optional compiled _width extension (see _width.pyx) takes over the
+stereo width step for float32 audio, planar or interleaved, when it has
+been built.
+Audio is laid out channels x samples, matching pedalboard.
+"""
+
+import math
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+try:
+    from _width import width as _simd_width, width_frames as _simd_width_frames
+except ImportError:
+    _simd_width = _simd_width_frames = None
+
+# Full scale of a float sample in 16-bit PCM, as libsndfile writes it
+PCM16_SCALE = 32767.0
+
+if HAVE_NUMBA:
+    # The TBB layer can hang interpreter shutdown once kernels have been
+    # launched from worker threads (apply_fx batch mode), so prefer OpenMP
+    # or numba's own workqueue.
+    numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+
+
+if HAVE_NUMBA:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _width_absmax(audio, width):
+        L = audio[0]
+        R = audio[1]
+        pk = 0.0
+        for i in prange(L.shape[0]):
+            m = (L[i] + R[i]) * 0.5
+            s = (L[i] - R[i]) * 0.5 * width
+            left = m + s
+            right = m - s
+            L[i] = left
+            R[i] = right
+            pk = max(pk, max(abs(left), abs(right)))
+        return pk
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _scale(audio, gain):
+        for c in range(audio.shape[0]):
+            row = audio[c]
+            for i in prange(row.shape[0]):
+                row[i] *= gain
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _pcm16(audio, dither):
+        channels, n = audio.shape
+        out = np.empty((n, channels), dtype=np.int16)
+        for i in prange(n):
+            for c in range(channels):
+                v = math.floor(audio[c, i] * PCM16_SCALE + dither[i, c] + 0.5)
+                out[i, c] = min(max(v, -32768.0), 32767.0)
+        return out
+
+else:
+
+    def _width_absmax(audio, width):
+        # [L; R] <- M [L; R] as a single BLAS matmul, on whichever axis
+        # order keeps the buffer contiguous (M is symmetric)
+        a = 0.5 * (1 + width)
+        b = 0.5 * (1 - width)
+        M = np.array([[a, b], [b, a]], dtype=audio.dtype)
+        if audio.T.flags.c_contiguous:
+            np.matmul(audio.T, M, out=audio.T)
+        else:
+            np.matmul(M, audio, out=audio)
+        return float(max(audio.max(), -audio.min()))
+
+    def _scale(audio, gain):
+        audio *= gain
+
+    def _pcm16(audio, dither):
+        dither += audio.T * np.float32(PCM16_SCALE)
+        np.rint(dither, out=dither)
+        np.clip(dither, -32768, 32767, out=dither)
+        return dither.astype(np.int16)
+
+
+# Numba's default "workqueue" threading layer aborts when two Python threads
+# launch parallel kernels at once (apply_fx batch mode runs jobs on a thread
+# pool), so launches are serialized. Each kernel already spans every core.
+_launch_lock = threading.Lock() if HAVE_NUMBA else nullcontext()
+
+
+def ms_width(audio, width):
+    """Apply mid/side width in place to a 2 x samples buffer (SIMD when built)."""
+    if not _simd_apply(audio, width):
+        with _launch_lock:
+            _width_absmax(audio, width)
+
+
+def width_absmax(audio, width):
+    """
+    Mid/side width in place on a 2 x samples buffer; returns the new
+    absolute peak. The SIMD kernel, when built, does the width and numpy
+    reductions over the contiguous buffer take the peak; otherwise one
+    fused kernel does both.
+    """
+    if _simd_apply(audio, width):
+        buf = audio.T if audio.T.flags.c_contiguous else audio
+        return float(max(buf.max(), -buf.min()))
+    with _launch_lock:
+        return _width_absmax(audio, width)
+
+
+def scale(audio, gain):
+    """Multiply every sample of a channels x samples buffer by ``gain`` in place."""
+    with _launch_lock:
+        _scale(audio, gain)
+
+
+def absmax(audio):
+    """Largest absolute sample of a channels x samples buffer."""
+    # Two vectorized reductions instead of materializing np.abs(audio); a
+    # numba prange max reduction doesn't vectorize and is ~5x slower per core
+    return float(max(audio.max(), -audio.min()))
+
+
+def pcm16(audio):
+    """
+    Quantize a channels x samples float buffer to interleaved (samples x
+    channels) int16 with TPDF dither, ready for a PCM_16 write.
+    """
+    # TPDF dither, the difference of two uniforms (+-1 LSB). numpy's
+    # generator fills it much faster than per-sample draws inside numba.
+    rng = np.random.default_rng()
+    dither = rng.random(audio.shape[::-1], dtype=np.float32)
+    dither -= rng.random(dither.shape, dtype=np.float32)
+    with _launch_lock:
+        return _pcm16(audio, dither)
+
+
+def aligned_empty(shape, dtype=np.float32, align=64):
+    """
+    Uninitialized C-order array whose data starts on an ``align``-byte
+    boundary, so SIMD loads over it never straddle cache lines.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    raw = np.empty(nbytes + align, dtype=np.uint8)
+    offset = -raw.ctypes.data % align
+    return raw[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _simd_apply(audio, width):
+    """
+    Apply width with the compiled kernel if it is built and takes this
+    buffer: float32 with contiguous rows, or interleaved (frames, 2) seen
+    through its transpose. Returns whether it ran.
+    """
+    if _simd_width is None or audio.dtype != np.float32:
+        return False
+    if audio.T.flags.c_contiguous:
+        _simd_width_frames(audio.T, width)
+    elif all(ch.flags.c_contiguous for ch in audio):
+        _simd_width(audio[0], audio[1], width)
+    else:
+        return False
+    return True
@@ -0,0 +1,205 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Mid/side stereo width as a compiled SIMD kernel: AVX-512 or AVX2 on x86-64
+(picked once at import from the CPU's features, with a scalar path for
+older CPUs) and NEON on ARM. Handles planar L/R rows and interleaved
+stereo frames. Optional; build in place with:  cythonize -i python/_width.pyx
+"""
+
+cdef extern from *:
+    """
+    #include <stddef.h>
+
+    #if defined(__GNUC__) && defined(__x86_64__)
+    #include <immintrin.h>
+    #define WIDTH_X86 1
+    #elif defined(__ARM_NEON) || defined(__aarch64__)
+    #include <arm_neon.h>
+    #define WIDTH_NEON 1
+    #endif
+
+    typedef void (*planar_fn)(float *, float *, size_t, float);
+    typedef void (*interleaved_fn)(float *, size_t, float);
+
+    static void width_scalar(float *L, float *R, size_t i, size_t n, float w)
+    {
+        for (; i < n; i++) {
+            float m = (L[i] + R[i]) * 0.5f;
+            float s = (L[i] - R[i]) * 0.5f * w;
+            L[i] = m + s;
+            R[i] = m - s;
+        }
+    }
+
+    /* Interleaved frames: L' = a*L + b*R and R' = b*L + a*R, so each
+       vector is a*x + b*(x with L/R swapped) with no de-interleaving */
+    static void width_scalar_interleaved(float *x, size_t i, size_t n, float w)
+    {
+        const float a = 0.5f * (1.0f + w), b = 0.5f * (1.0f - w);
+        for (; i < n; i += 2) {
+            float l = x[i], r = x[i + 1];
+            x[i] = a * l + b * r;
+            x[i + 1] = b * l + a * r;
+        }
+    }
+
+    static void planar_scalar(float *L, float *R, size_t n, float w)
+    {
+        width_scalar(L, R, 0, n, w);
+    }
+
+    static void interleaved_scalar(float *x, size_t n, float w)
+    {
+        width_scalar_interleaved(x, 0, n, w);
+    }
+
+    #if WIDTH_X86
+    __attribute__((target("avx2")))
+    static void planar_avx2(float *L, float *R, size_t n, float w)
+    {
+        const __m256 half = _mm256_set1_ps(0.5f);
+        const __m256 wv = _mm256_set1_ps(w);
+        size_t i = 0;
+        for (; i + 8 <= n; i += 8) {
+            __m256 a = _mm256_loadu_ps(L + i);
+            __m256 b = _mm256_loadu_ps(R + i);
+            __m256 m = _mm256_mul_ps(_mm256_add_ps(a, b), half);
+            __m256 s = _mm256_mul_ps(_mm256_mul_ps(_mm256_sub_ps(a, b), half), wv);
+            _mm256_storeu_ps(L + i, _mm256_add_ps(m, s));
+            _mm256_storeu_ps(R + i, _mm256_sub_ps(m, s));
+        }
+        width_scalar(L, R, i, n, w);
+    }
+
+    __attribute__((target("avx2")))
+    static void interleaved_avx2(float *x, size_t n, float w)
+    {
+        const __m256 a = _mm256_set1_ps(0.5f * (1.0f + w));
+        const __m256 b = _mm256_set1_ps(0.5f * (1.0f - w));
+        size_t i = 0;
+        for (; i + 8 <= n; i += 8) {
+            __m256 v = _mm256_loadu_ps(x + i);
+            __m256 swapped = _mm256_permute_ps(v, 0xB1);
+            _mm256_storeu_ps(x + i, _mm256_add_ps(_mm256_mul_ps(a, v), _mm256_mul_ps(b, swapped)));
+        }
+        width_scalar_interleaved(x, i, n, w);
+    }
+
+    __attribute__((target("avx512f")))
+    static void planar_avx512(float *L, float *R, size_t n, float w)
+    {
+        const __m512 half = _mm512_set1_ps(0.5f);
+        const __m512 wv = _mm512_set1_ps(w);
+        size_t i = 0;
+        for (; i + 16 <= n; i += 16) {
+            __m512 a = _mm512_loadu_ps(L + i);
+            __m512 b = _mm512_loadu_ps(R + i);
+            __m512 m = _mm512_mul_ps(_mm512_add_ps(a, b), half);
+            __m512 s = _mm512_mul_ps(_mm512_mul_ps(_mm512_sub_ps(a, b), half), wv);
+            _mm512_storeu_ps(L + i, _mm512_add_ps(m, s));
+            _mm512_storeu_ps(R + i, _mm512_sub_ps(m, s));
+        }
+        width_scalar(L, R, i, n, w);
+    }
+
+    __attribute__((target("avx512f")))
+    static void interleaved_avx512(float *x, size_t n, float w)
+    {
+        const __m512 a = _mm512_set1_ps(0.5f * (1.0f + w));
+        const __m512 b = _mm512_set1_ps(0.5f * (1.0f - w));
+        size_t i = 0;
+        for (; i + 16 <= n; i += 16) {
+            __m512 v = _mm512_loadu_ps(x + i);
+            __m512 swapped = _mm512_permute_ps(v, 0xB1);
+            _mm512_storeu_ps(x + i, _mm512_fmadd_ps(a, v, _mm512_mul_ps(b, swapped)));
+        }
+        width_scalar_interleaved(x, i, n, w);
+    }
+    #endif
+
+    #if WIDTH_NEON
+    static void planar_neon(float *L, float *R, size_t n, float w)
+    {
+        const float32x4_t half = vdupq_n_f32(0.5f);
+        const float32x4_t wv = vdupq_n_f32(w);
+        size_t i = 0;
+        for (; i + 4 <= n; i += 4) {
+            float32x4_t a = vld1q_f32(L + i);
+            float32x4_t b = vld1q_f32(R + i);
+            float32x4_t m = vmulq_f32(vaddq_f32(a, b), half);
+            float32x4_t s = vmulq_f32(vmulq_f32(vsubq_f32(a, b), half), wv);
+            vst1q_f32(L + i, vaddq_f32(m, s));
+            vst1q_f32(R + i, vsubq_f32(m, s));
+        }
+        width_scalar(L, R, i, n, w);
+    }
+
+    static void interleaved_neon(float *x, size_t n, float w)
+    {
+        const float32x4_t a = vdupq_n_f32(0.5f * (1.0f + w));
+        const float32x4_t b = vdupq_n_f32(0.5f * (1.0f - w));
+        size_t i = 0;
+        for (; i + 4 <= n; i += 4) {
+            float32x4_t v = vld1q_f32(x + i);
+            float32x4_t swapped = vrev64q_f32(v);
+            vst1q_f32(x + i, vmlaq_f32(vmulq_f32(b, swapped), a, v));
+        }
+        width_scalar_interleaved(x, i, n, w);
+    }
+    #endif
+
+    static planar_fn width_planar = planar_scalar;
+    static interleaved_fn width_interleaved = interleaved_scalar;
+    static const char *width_isa = "scalar";
+
+    /* Bind the widest kernels this CPU supports; called once at import */
+    static void width_init(void)
+    {
+    #if WIDTH_X86
+        __builtin_cpu_init();
+        if (__builtin_cpu_supports("avx512f")) {
+            width_planar = planar_avx512;
+            width_interleaved = interleaved_avx512;
+            width_isa = "avx512";
+        } else if (__builtin_cpu_supports("avx2")) {
+            width_planar = planar_avx2;
+            width_interleaved = interleaved_avx2;
+            width_isa = "avx2";
+        }
+    #elif WIDTH_NEON
+        width_planar = planar_neon;
+        width_interleaved = interleaved_neon;
+        width_isa = "neon";
+    #endif
+    }
+    """
+    void width_init()
+    void width_planar(float *L, float *R, size_t n, float w) nogil
+    void width_interleaved(float *x, size_t n, float w) nogil
+    const char *width_isa
+
+
+width_init()
+
+# Instruction set the kernels were bound to: "avx512", "avx2", "neon" or "scalar"
+ISA = width_isa.decode()
+
+
+def width(float[::1] L, float[::1] R, float w):
+    """Apply mid/side width in place to float32, C-contiguous L/R channels."""
+    if L.shape[0] != R.shape[0]:
+        raise ValueError("L and R must have the same length")
+    if L.shape[0] == 0:
+        return
+    with nogil:
+        width_planar(&L[0], &R[0], <size_t>L.shape[0], w)
+
+
+def width_frames(float[:, ::1] frames, float w):
+    """Apply mid/side width in place to C-contiguous float32 (frames, 2) stereo."""
+    if frames.shape[1] != 2:
+        raise ValueError("frames must have two channels")
+    if frames.shape[0] == 0:
+        return
+    with nogil:
+        width_interleaved(&frames[0, 0], <size_t>frames.shape[0] * 2, w)
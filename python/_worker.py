@@ -0,0 +1,42 @@
+"""
+NDJSON request loop behind the bridge scripts' --server mode.
+Each stdin line is one JSON request and gets exactly one JSON line back on
+stdout, so the host can keep one warmed interpreter per script instead of
+starting Python (and re-importing pedalboard/torch/matchering) per job.
+"""
+
+import importlib
+import json
+import sys
+
+
+def serve(handle, preload=()):
+    """Answer requests from stdin with ``handle(request) -> dict`` until EOF."""
+    # Keep the protocol stream to ourselves; stray prints go to stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    # Pay the heavy imports up front rather than on the first job
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            result = {"error": f"Invalid JSON: {e}"}
+        else:
+            try:
+                result = handle(request)
+            except Exception as e:
+                result = {"error": str(e)}
+
+        out.write(json.dumps(result) + "\n")
+        out.flush()
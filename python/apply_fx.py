@@ -2,17 +2,45 @@
 """
 DSP effects bridge script for the mastering CLI.
 Applies EQ, compression, limiting, and stereo adjustments using pedalboard.
-Receives a JSON argument with input, output, and mastering parameters.
-Outputs a JSON result to stdout.
+Receives a JSON argument with input, output, and mastering parameters,
+or {"jobs": [...]} holding several such requests to run as one batch.
+Outputs a JSON result (an array of results in batch mode) to stdout.
+With --server, serves such requests as NDJSON over stdin/stdout instead.
 """
 
+import hashlib
 import json
+import math
 import sys
 import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
+from _dsp_kernels import absmax, aligned_empty, ms_width, pcm16, scale, width_absmax
+from _worker import serve
+from loudness import DB_TO_LIN, SILENCE_LUFS, LoudnessMeter, measure_lufs
+
+# Frames per block when streaming audio through the pedalboard chain
+BLOCK_FRAMES = 65536
+
+# EQs with at least this many bands run as one biquad cascade instead of
+# one pedalboard filter per band
+CASCADE_MIN_BANDS = 5
+
+# Per-thread LRU cache of built pedalboards, see _get_board()
+_thread_boards = threading.local()
+BOARD_CACHE_SIZE = 32
+
 
 def main():
+    if "--server" in sys.argv[1:]:
+        serve(handle_request, preload=("pedalboard", "soundfile"))
+        return
+
     if len(sys.argv) < 2:
         print(json.dumps({"error": "No arguments provided"}))
         sys.exit(1)
@@ -23,44 +51,166 @@ def main():
         print(json.dumps({"error": f"Invalid JSON: {e}"}))
         sys.exit(1)
 
-    input_path = request.get("input")
-    output_path = request.get("output")
-    params = request.get("params", {})
-    bit_depth = request.get("bit_depth", 24)
+    result = handle_request(request)
+    print(json.dumps(result))
+    failed = result if isinstance(result, list) else [result]
+    if any("error" in r for r in failed):
+        sys.exit(1)
+
+
+def handle_request(request):
+    """Dispatch a single job, or a {"jobs": [...]} batch to a list of results."""
+    if isinstance(request.get("jobs"), list):
+        return run_batch(request["jobs"])
+    return run_job(request)
+
+
+def run_batch(jobs):
+    """
+    Run several jobs in this interpreter on a thread pool, so the
+    pedalboard/numpy import cost is paid once per batch instead of per file.
+
+    Threads, not multiprocessing: pedalboard releases the GIL while decoding
+    and processing, and forking a process that has already loaded pedalboard
+    can crash the child.
+    """
+    workers = max(1, min(len(jobs), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_job, jobs))
+
+
+def run_job(job):
+    """Process one {input, output, params, bit_depth} request; returns its JSON result."""
+    input_path = job.get("input")
+    output_path = job.get("output")
+    params = job.get("params", {})
+    bit_depth = job.get("bit_depth", 24)
 
     if not input_path or not output_path:
-        print(json.dumps({"error": "Missing required fields: input, output"}))
-        sys.exit(1)
+        return {"error": "Missing required fields: input, output"}
 
     if not os.path.exists(input_path):
-        print(json.dumps({"error": f"Input file not found: {input_path}"}))
-        sys.exit(1)
+        return {"error": f"Input file not found: {input_path}"}
 
     try:
         apply_effects(input_path, output_path, params, bit_depth)
-        print(json.dumps({
+        return {
             "output": output_path,
             "message": "DSP effects applied successfully",
-        }))
+        }
     except ImportError as e:
         # Fallback to soundfile + numpy if pedalboard isn't available
         sys.stderr.write(f"[apply_fx] pedalboard not available ({e}), using numpy fallback\n")
         try:
             apply_effects_fallback(input_path, output_path, params, bit_depth)
-            print(json.dumps({
+            return {
                 "output": output_path,
                 "message": "DSP effects applied (numpy fallback)",
-            }))
+            }
         except Exception as e2:
-            print(json.dumps({"error": str(e2)}))
-            sys.exit(1)
+            return {"error": str(e2)}
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+        return {"error": str(e)}
 
 
 def apply_effects(input_path, output_path, params, bit_depth):
-    """Apply effects using the pedalboard library."""
+    """
+    Apply effects using the pedalboard library.
+
+    The file is streamed through the chain in blocks, so peak memory is
+    O(block) rather than O(track). The chain runs once: its output is
+    metered while being spooled to a float32 temp file, and the loudness
+    gain is applied while copying the spool to the output.
+    """
+    import soundfile as sf
+    from pedalboard.io import AudioFile
+
+    board = _get_board(params)
+    # Cached boards still hold filter/envelope state from the last file
+    board.reset()
+
+    stereo = params.get("stereo", {})
+    width = stereo.get("width", 1.0)
+
+    subtype_map = {16: "PCM_16", 24: "PCM_24", 32: "FLOAT"}
+    subtype = subtype_map.get(bit_depth, "PCM_24")
+
+    with AudioFile(input_path) as f, tempfile.TemporaryFile() as spool:
+        sample_rate = f.samplerate
+        channels = f.num_channels
+        widen = channels == 2 and abs(width - 1.0) > 0.01
+
+        eq = None
+        bands = _eq_bands(params)
+        if len(bands) >= CASCADE_MIN_BANDS:
+            from _biquad_cascade import BiquadCascade, eq_sos
+            eq = BiquadCascade(eq_sos(bands, sample_rate), channels)
+
+        # Pass 1: width + full chain, metered and spooled
+        meter = LoudnessMeter(sample_rate, channels)
+        while f.tell() < f.frames:
+            chunk = f.read(BLOCK_FRAMES)
+            if widen:
+                ms_width(chunk, width)
+            if eq is not None:
+                eq.process(chunk)
+            chunk = board.process(chunk, sample_rate, reset=False)
+            interleaved = np.ascontiguousarray(chunk.T)
+            meter.update(interleaved)
+            spool.write(interleaved)
+
+        # Pass 2: apply the loudness gain while writing the output
+        # (dithered to int16 by pcm16() for 16-bit files)
+        target_lufs = params.get("target_lufs", -14.0)
+        gain_linear = math.exp(_loudness_gain_db(meter, target_lufs) * DB_TO_LIN)
+        spool.seek(0)
+        block = np.empty((BLOCK_FRAMES, channels), dtype=np.float32)
+        with sf.SoundFile(output_path, "w", sample_rate, channels, subtype=subtype) as out:
+            while True:
+                frames = spool.readinto(block) // block[0].nbytes
+                if frames == 0:
+                    break
+                chunk = block[:frames]
+                if gain_linear != 1.0:
+                    chunk *= gain_linear
+                out.write(pcm16(chunk.T) if bit_depth == 16 else chunk)
+
+
+def _loudness_gain_db(meter, target_lufs):
+    """Gain (dB) that moves the metered loudness toward target LUFS."""
+    current_lufs = meter.integrated_loudness()
+    if current_lufs <= SILENCE_LUFS:
+        return 0.0
+    # Limit the gain adjustment to avoid extreme changes
+    return float(np.clip(target_lufs - current_lufs, -12.0, 12.0))
+
+
+def _get_board(params):
+    """
+    Return the effect chain for ``params``. Boards are cached per worker
+    thread, keyed by a digest of the settings they are built from (not
+    the target loudness or width), so a batch or a long-lived server that
+    reuses settings (e.g. an album) builds each chain once per thread. The
+    least recently used of more than BOARD_CACHE_SIZE boards is dropped.
+    """
+    cache = getattr(_thread_boards, "cache", None)
+    if cache is None:
+        cache = _thread_boards.cache = OrderedDict()
+
+    settings = {name: params.get(name) for name in ("eq", "compression", "limiter")}
+    key = hashlib.blake2b(json.dumps(settings, sort_keys=True).encode()).digest()
+    board = cache.get(key)
+    if board is None:
+        board = cache[key] = build_board(params)
+        if len(cache) > BOARD_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return board
+
+
+def build_board(params):
+    """Build the pedalboard EQ -> compressor -> makeup -> limiter chain."""
     from pedalboard import (
         Pedalboard,
         Compressor,
@@ -70,20 +220,19 @@ def apply_effects(input_path, output_path, params, bit_depth):
         PeakFilter,
         Limiter,
     )
-    from pedalboard.io import AudioFile
 
     board = Pedalboard()
 
-    # EQ bands
-    for band in params.get("eq", []):
+    # EQ bands; larger EQs run as a BiquadCascade ahead of the board instead
+    bands = _eq_bands(params)
+    if len(bands) >= CASCADE_MIN_BANDS:
+        bands = []
+    for band in bands:
         freq = band.get("frequency", 1000)
         gain = band.get("gain_db", 0)
         q = band.get("q", 0.707)
         band_type = band.get("band_type", "peak")
 
-        if abs(gain) < 0.1:
-            continue
-
         if band_type == "low_shelf":
             board.append(LowShelfFilter(cutoff_frequency_hz=freq, gain_db=gain, q=q))
         elif band_type == "high_shelf":
@@ -116,85 +265,67 @@ def apply_effects(input_path, output_path, params, bit_depth):
             release_ms=release,
         ))
 
-    # Process
-    with AudioFile(input_path) as f:
-        sample_rate = f.samplerate
-        audio = f.read(f.frames)
-
-    # Apply stereo width adjustment
-    stereo = params.get("stereo", {})
-    width = stereo.get("width", 1.0)
-    if audio.shape[0] == 2 and abs(width - 1.0) > 0.01:
-        mid = (audio[0] + audio[1]) / 2.0
-        side = (audio[0] - audio[1]) / 2.0
-        side *= width
-        audio[0] = mid + side
-        audio[1] = mid - side
-
-    # Apply the pedalboard chain
-    processed = board(audio, sample_rate)
+    return board
 
-    # Loudness normalization toward target LUFS
-    target_lufs = params.get("target_lufs", -14.0)
-    current_rms = np.sqrt(np.mean(processed ** 2))
-    if current_rms > 1e-10:
-        current_db = 20 * np.log10(current_rms)
-        # Approximate LUFS as RMS - 0.691
-        current_lufs_approx = current_db - 0.691
-        gain_needed = target_lufs - current_lufs_approx
-        # Limit the gain adjustment to avoid extreme changes
-        gain_needed = np.clip(gain_needed, -12.0, 12.0)
-        gain_linear = 10 ** (gain_needed / 20.0)
-        processed *= gain_linear
 
-    # Write output
-    subtype_map = {16: "PCM_16", 24: "PCM_24", 32: "FLOAT"}
-    subtype = subtype_map.get(bit_depth, "PCM_24")
-
-    import soundfile as sf
-    sf.write(output_path, processed.T, sample_rate, subtype=subtype)
+def _eq_bands(params):
+    """EQ bands of ``params`` that actually filter."""
+    return [
+        band for band in params.get("eq", [])
+        if abs(band.get("gain_db", 0)) >= 0.1
+        and band.get("band_type", "peak") in ("low_shelf", "high_shelf", "peak")
+    ]
 
 
 def apply_effects_fallback(input_path, output_path, params, bit_depth):
     """Minimal fallback using only numpy and soundfile."""
     import soundfile as sf
 
-    audio, sample_rate = sf.read(input_path, always_2d=True)
+    # Decode straight into a 64-byte aligned float32 buffer: half the bytes
+    # of sf.read()'s float64 for every pass below, and whole cache lines
+    # for the SIMD width kernel
+    with sf.SoundFile(input_path) as f:
+        sample_rate = f.samplerate
+        audio = aligned_empty((f.frames, f.channels))
+        f.read(out=audio)
     audio = audio.T  # channels x samples
 
-    # Simple stereo width
+    # Simple stereo width (also yields the peak for the limiter below)
     stereo = params.get("stereo", {})
     width = stereo.get("width", 1.0)
+    peak = None
     if audio.shape[0] == 2 and abs(width - 1.0) > 0.01:
-        mid = (audio[0] + audio[1]) / 2.0
-        side = (audio[0] - audio[1]) / 2.0
-        side *= width
-        audio[0] = mid + side
-        audio[1] = mid - side
+        peak = width_absmax(audio, width)
 
     # Simple gain for loudness target
+    gain_linear = 1.0
     target_lufs = params.get("target_lufs", -14.0)
-    current_rms = np.sqrt(np.mean(audio ** 2))
-    if current_rms > 1e-10:
-        current_db = 20 * np.log10(current_rms)
-        current_lufs_approx = current_db - 0.691
-        gain_needed = target_lufs - current_lufs_approx
+    current_lufs = measure_lufs(audio.T, sample_rate)
+    if current_lufs > SILENCE_LUFS:
+        gain_needed = target_lufs - current_lufs
         gain_needed = np.clip(gain_needed, -12.0, 12.0)
-        gain_linear = 10 ** (gain_needed / 20.0)
-        audio *= gain_linear
+        gain_linear = math.exp(gain_needed * DB_TO_LIN)
 
-    # Simple limiter
+    # Simple limiter, folded into the loudness gain: the peak after
+    # normalization is just peak * gain_linear.
     limiter = params.get("limiter", {})
     if limiter.get("enabled", True):
         ceiling_db = limiter.get("ceiling_db", -1.0)
-        ceiling_linear = 10 ** (ceiling_db / 20.0)
-        peak = np.max(np.abs(audio))
-        if peak > ceiling_linear:
-            audio *= ceiling_linear / peak
+        ceiling_linear = math.exp(ceiling_db * DB_TO_LIN)
+        if peak is None:
+            peak = absmax(audio)
+        if peak * gain_linear > ceiling_linear:
+            gain_linear = ceiling_linear / peak
+
+    # Apply the combined gain in a single pass
+    if gain_linear != 1.0:
+        scale(audio, gain_linear)
 
     subtype_map = {16: "PCM_16", 24: "PCM_24", 32: "FLOAT"}
     subtype = subtype_map.get(bit_depth, "PCM_24")
-    sf.write(output_path, audio.T, sample_rate, subtype=subtype)
+    # 16-bit output is dithered and quantized here; libsndfile writes it as is
+    samples = pcm16(audio) if bit_depth == 16 else audio.T
+    sf.write(output_path, samples, sample_rate, subtype=subtype)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+BS.1770 integrated loudness on CUDA tensors for the ML bridge.
+The K-weighting IIR is truncated to an FIR and applied as an FFT convolution
+in fixed-size overlap-save blocks, which runs vectorized on the GPU instead
+of as a per-sample recursion, in bounded memory however long the track. On
+CPU the IIR in loudness.py is faster, so the bridge only uses this with CUDA.
+"""
+
+import numpy as np
+import torch
+
+from loudness import (
+    HOP_SECONDS,
+    HOPS_PER_BLOCK,
+    block_loudness,
+    channel_weights,
+    gated_loudness,
+    k_weighting_sos,
+)
+
+# K-weighting impulse response length; its high pass decays within ~1000 samples
+FIR_TAPS = 8192
+
+# Largest FFT per overlap-save block; each block yields FFT_SIZE - FIR_TAPS + 1
+# samples of output at most
+FFT_SIZE = 1 << 20
+
+# FIR per (sample rate, device, dtype)
+_firs = {}
+
+
+def integrated_loudness(audio, sr):
+    """Integrated loudness in LUFS of a (channels, samples) tensor."""
+    channels, n = audio.shape
+    fir = _k_weighting_fir(sr, audio.device, audio.dtype)
+    taps = fir.shape[-1]
+    hop = max(1, int(round(HOP_SECONDS * sr)))
+
+    # Overlap-save: each block's output covers a whole number of hops, and
+    # its input carries the taps - 1 samples before it as history
+    size = min(FFT_SIZE, 1 << (max(n, hop) + taps - 2).bit_length())
+    step = (size - taps + 1) // hop * hop
+    fir_spectrum = torch.fft.rfft(fir, size)
+
+    total = torch.zeros(channels, dtype=torch.float64, device=audio.device)
+    energy = []
+    for start in range(0, n, step):
+        first = start - taps + 1
+        segment = audio[:, max(0, first):start + step]
+        if first < 0:
+            # Zero history before the start of the track
+            segment = torch.nn.functional.pad(segment, (-first, 0))
+        weighted = torch.fft.irfft(torch.fft.rfft(segment, size) * fir_spectrum, size)
+        squared = weighted[:, taps - 1:segment.shape[-1]].pow(2)
+        total += squared.sum(dim=-1)
+        full = squared.shape[-1] // hop
+        energy.append(squared[:, :full * hop].reshape(channels, full, hop).sum(dim=-1))
+
+    weights = channel_weights(channels)
+    energy = torch.cat(energy, dim=-1)
+    if energy.shape[-1] < HOPS_PER_BLOCK:
+        # Shorter than a single gating block: ungated K-weighted loudness
+        return block_loudness(weights, (total / n).cpu().numpy())
+
+    # Mean square per channel of each overlapping 400 ms block
+    z = energy.unfold(1, HOPS_PER_BLOCK, 1).sum(dim=-1) / (HOPS_PER_BLOCK * hop)
+    return gated_loudness(z.T.double().cpu().numpy(), weights)
+
+
+def _k_weighting_fir(sr, device, dtype):
+    """Impulse response of the BS.1770 K-weighting filter, truncated to FIR_TAPS."""
+    key = (sr, str(device), dtype)
+    fir = _firs.get(key)
+    if fir is None:
+        from scipy.signal import sosfilt
+
+        impulse = np.zeros(FIR_TAPS)
+        impulse[0] = 1.0
+        response = sosfilt(k_weighting_sos(sr), impulse)
+        fir = _firs[key] = torch.from_numpy(response).to(device=device, dtype=dtype)
+    return fir
@@ -0,0 +1,184 @@
+"""
+Loudness measurement shared by the DSP bridge scripts.
+Integrated loudness follows ITU-R BS.1770 (K-weighted, gated) via pyloudnorm.
+If pyloudnorm isn't installed, an RMS-based approximation is used instead.
+LoudnessMeter measures the same quantity block by block for streamed audio.
+"""
+
+import math
+
+import numpy as np
+
+# 10 ** (db / 20) == exp(db * DB_TO_LIN); exp is cheaper than pow
+DB_TO_LIN = math.log(10) / 20
+
+# Anything quieter than the BS.1770 absolute gate is treated as silence.
+SILENCE_LUFS = -70.0
+
+# BS.1770 gating: 400 ms blocks with 75% overlap, i.e. a 100 ms hop
+HOPS_PER_BLOCK = 4
+HOP_SECONDS = 0.1
+
+# Per-channel weights (L, R, C, Ls, Rs); further channels get 1.0
+_CHANNEL_WEIGHTS = (1.0, 1.0, 1.0, 1.41, 1.41)
+
+# One meter per sample rate, reused across calls
+_meters = {}
+
+
+def measure_lufs(audio, sr):
+    """
+    Integrated loudness in LUFS of ``audio`` shaped (samples, channels).
+    Every sample is measured at the full rate: decimating moves Nyquist
+    below the band K-weighting emphasizes, and a sparse sample in time
+    can lock onto the tempo of the music.
+    """
+    try:
+        import pyloudnorm as pyln
+    except ImportError:
+        return _rms_lufs(audio)
+
+    meter = _meters.get(sr)
+    if meter is None:
+        meter = _meters[sr] = pyln.Meter(sr)
+
+    try:
+        return float(meter.integrated_loudness(audio))
+    except ValueError:
+        # Shorter than a single 400 ms gating block
+        return _rms_lufs(audio)
+
+
+def _rms_lufs(audio):
+    """Approximate LUFS as RMS - 0.691 (no K-weighting or gating)."""
+    rms = np.sqrt(np.mean(np.square(audio, dtype=np.float64)))
+    if rms <= 1e-10:
+        return float("-inf")
+    return float(20 * np.log10(rms) - 0.691)
+
+
+class LoudnessMeter:
+    """
+    Streaming BS.1770 integrated loudness meter. Feed consecutive
+    (samples, channels) blocks to update(), then call integrated_loudness().
+    Only one energy value per channel per 100 ms is kept, so memory stays
+    small however long the stream is.
+    """
+
+    def __init__(self, sr, channels):
+        # The numba DF2T cascade, so the streaming path never imports scipy
+        from _biquad_cascade import BiquadCascade
+
+        self._k_weighting = BiquadCascade(k_weighting_sos(sr), channels)
+        self._weights = channel_weights(channels)
+        self._hop = max(1, int(round(HOP_SECONDS * sr)))
+        self._hops = []
+        self._partial = np.zeros(channels)
+        self._partial_len = 0
+
+    def update(self, block):
+        """Add the next (samples, channels) block of the stream."""
+        # K-weight a float64 (channels, samples) copy; the block is untouched
+        weighted = np.array(block.T, dtype=np.float64, order="C")
+        energy = np.square(self._k_weighting.process(weighted), out=weighted)
+        n = energy.shape[1]
+
+        # Top up the hop left unfinished by the previous block
+        need = self._hop - self._partial_len
+        if n < need:
+            self._partial += energy.sum(axis=1)
+            self._partial_len += n
+            return
+        self._hops.append(self._partial + energy[:, :need].sum(axis=1))
+        pos = need
+
+        full = (n - pos) // self._hop
+        if full:
+            end = pos + full * self._hop
+            hops = energy[:, pos:end].reshape(-1, full, self._hop).sum(axis=2)
+            self._hops.extend(hops.T)
+            pos = end
+
+        self._partial = energy[:, pos:].sum(axis=1)
+        self._partial_len = n - pos
+
+    def integrated_loudness(self):
+        """Gated integrated loudness in LUFS of everything fed so far."""
+        hops = np.array(self._hops).reshape(-1, len(self._weights))
+        if len(hops) < HOPS_PER_BLOCK:
+            # Shorter than a single gating block: ungated K-weighted loudness
+            total = hops.sum(axis=0) + self._partial
+            samples = len(hops) * self._hop + self._partial_len
+            if samples == 0:
+                return float("-inf")
+            return block_loudness(self._weights, total / samples)
+
+        # Mean square per channel of each overlapping 400 ms block
+        count = len(hops) - HOPS_PER_BLOCK + 1
+        blocks = sum(hops[i:i + count] for i in range(HOPS_PER_BLOCK))
+        return gated_loudness(blocks / (HOPS_PER_BLOCK * self._hop), self._weights)
+
+
+def gated_loudness(z, weights):
+    """
+    BS.1770 gated loudness in LUFS from ``z``, the per-channel mean square
+    of each 400 ms block shaped (blocks, channels).
+    """
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10 * np.log10(z @ weights)
+
+    gated = block_lufs > SILENCE_LUFS
+    if not gated.any():
+        return float("-inf")
+    relative_gate = block_loudness(weights, z[gated].mean(axis=0)) - 10.0
+
+    gated &= block_lufs > relative_gate
+    return block_loudness(weights, z[gated].mean(axis=0))
+
+
+def channel_weights(channels):
+    """BS.1770 channel weights for a stream with ``channels`` channels."""
+    return np.array(
+        [_CHANNEL_WEIGHTS[c] if c < len(_CHANNEL_WEIGHTS) else 1.0 for c in range(channels)]
+    )
+
+
+def k_weighting_sos(sr):
+    """BS.1770 K-weighting (high shelf + high pass) as second-order sections."""
+    shelf = _biquad("high_shelf", 1500.0, 4.0, 1 / np.sqrt(2), sr)
+    high_pass = _biquad("high_pass", 38.0, 0.0, 0.5, sr)
+    return np.array([shelf, high_pass])
+
+
+def _biquad(kind, fc, gain_db, q, sr):
+    """RBJ cookbook biquad as one normalized [b0, b1, b2, 1, a1, a2] section."""
+    A = math.exp(gain_db * DB_TO_LIN / 2)  # 10 ** (gain_db / 40)
+    w0 = 2 * np.pi * fc / sr
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * q)
+
+    if kind == "high_shelf":
+        beta = 2 * np.sqrt(A) * alpha
+        b = [
+            A * ((A + 1) + (A - 1) * cos_w0 + beta),
+            -2 * A * ((A - 1) + (A + 1) * cos_w0),
+            A * ((A + 1) + (A - 1) * cos_w0 - beta),
+        ]
+        a = [
+            (A + 1) - (A - 1) * cos_w0 + beta,
+            2 * ((A - 1) - (A + 1) * cos_w0),
+            (A + 1) - (A - 1) * cos_w0 - beta,
+        ]
+    else:  # high_pass
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+
+    return [b[0] / a[0], b[1] / a[0], b[2] / a[0], 1.0, a[1] / a[0], a[2] / a[0]]
+
+
+def block_loudness(weights, mean_square):
+    """Loudness in LUFS of per-channel mean-square energies."""
+    total = float(np.dot(weights, mean_square))
+    if total <= 0:
+        return float("-inf")
+    return -0.691 + 10 * np.log10(total)
@@ -3,14 +3,22 @@
 Matchering bridge script for the mastering CLI.
 Receives a JSON argument with target, reference, output, and options.
 Outputs a JSON result to stdout.
+With --server, serves such requests as NDJSON over stdin/stdout instead.
 """
 
 import json
 import sys
 import os
+from functools import lru_cache
+
+from _worker import serve
 
 
 def main():
+    if "--server" in sys.argv[1:]:
+        serve(run_job, preload=("matchering",))
+        return
+
     if len(sys.argv) < 2:
         print(json.dumps({"error": "No arguments provided"}))
         sys.exit(1)
@@ -21,6 +29,14 @@ def main():
         print(json.dumps({"error": f"Invalid JSON: {e}"}))
         sys.exit(1)
 
+    result = run_job(request)
+    print(json.dumps(result))
+    if "error" in result:
+        sys.exit(1)
+
+
+def run_job(request):
+    """Match one target to its reference; returns the JSON result."""
     target = request.get("target")
     reference = request.get("reference")
     output = request.get("output")
@@ -28,21 +44,16 @@ def main():
     no_limiter = request.get("no_limiter", False)
 
     if not target or not reference or not output:
-        print(json.dumps({"error": "Missing required fields: target, reference, output"}))
-        sys.exit(1)
+        return {"error": "Missing required fields: target, reference, output"}
 
     if not os.path.exists(target):
-        print(json.dumps({"error": f"Target file not found: {target}"}))
-        sys.exit(1)
+        return {"error": f"Target file not found: {target}"}
 
     if not os.path.exists(reference):
-        print(json.dumps({"error": f"Reference file not found: {reference}"}))
-        sys.exit(1)
+        return {"error": f"Reference file not found: {reference}"}
 
     try:
-        import matchering as mg
-
-        mg.log(lambda msg: sys.stderr.write(f"[matchering] {msg}\n"))
+        mg, default_config, no_limiter_config = _matchering()
 
         results = []
         if bit_depth == 16:
@@ -52,43 +63,38 @@ def main():
         else:
             results.append(mg.pcm24(output))
 
-        config = mg.Config() if not no_limiter else mg.Config(
-            limiter=False,
-            limiter_attack=0,
-            limiter_release=0,
+        mg.process(
+            target=target,
+            reference=reference,
+            results=results,
+            config=no_limiter_config if no_limiter else default_config,
         )
 
-        # matchering.Config doesn't take limiter params that way, use defaults
-        if no_limiter:
-            mg.process(
-                target=target,
-                reference=reference,
-                results=results,
-                config=mg.Config(
-                    threshold=0.9999,
-                ),
-            )
-        else:
-            mg.process(
-                target=target,
-                reference=reference,
-                results=results,
-            )
-
-        print(json.dumps({
+        return {
             "output": output,
             "message": f"Matchering completed: matched to reference ({os.path.basename(reference)})",
             "bit_depth": bit_depth,
-        }))
+        }
 
     except ImportError:
-        print(json.dumps({
+        return {
             "error": "matchering package not installed. Run: pip install matchering"
-        }))
-        sys.exit(1)
+        }
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+        return {"error": str(e)}
+
+
+@lru_cache(maxsize=None)
+def _matchering():
+    """
+    Import matchering, route its log to stderr and build the default and
+    no-limiter configs, once per process (a --server worker reuses them).
+    """
+    import matchering as mg
+
+    mg.log(lambda msg: sys.stderr.write(f"[matchering] {msg}\n"))
+    # no_limiter jobs run with a near-full-scale threshold
+    return mg, mg.Config(), mg.Config(threshold=0.9999)
 
 
 if __name__ == "__main__":
@@ -4,14 +4,22 @@ ML inference bridge script for the mastering CLI.
 Runs local machine learning models for audio mastering.
 Receives a JSON argument with input, output, model name, and options.
 Outputs a JSON result to stdout.
+With --server, serves such requests as NDJSON over stdin/stdout instead.
 """
 
 import json
+import math
 import sys
 import os
 
+from _worker import serve
+
 
 def main():
+    if "--server" in sys.argv[1:]:
+        serve(run_job, preload=("numpy", "soundfile", "torch"))
+        return
+
     if len(sys.argv) < 2:
         print(json.dumps({"error": "No arguments provided"}))
         sys.exit(1)
@@ -22,6 +30,14 @@ def main():
         print(json.dumps({"error": f"Invalid JSON: {e}"}))
         sys.exit(1)
 
+    result = run_job(request)
+    print(json.dumps(result))
+    if "error" in result:
+        sys.exit(1)
+
+
+def run_job(request):
+    """Run one model over one input file; returns the JSON result."""
     input_path = request.get("input")
     output_path = request.get("output")
     model_name = request.get("model", "deepafx-st")
@@ -30,12 +46,10 @@ def main():
     target_lufs = request.get("target_lufs", -14.0)
 
     if not input_path or not output_path:
-        print(json.dumps({"error": "Missing required fields: input, output"}))
-        sys.exit(1)
+        return {"error": "Missing required fields: input, output"}
 
     if not os.path.exists(input_path):
-        print(json.dumps({"error": f"Input file not found: {input_path}"}))
-        sys.exit(1)
+        return {"error": f"Input file not found: {input_path}"}
 
     try:
         if model_name == "deepafx-st":
@@ -43,20 +57,18 @@ def main():
         else:
             process_huggingface(input_path, output_path, model_name, bit_depth, target_lufs)
 
-        print(json.dumps({
+        return {
             "output": output_path,
             "message": f"ML inference completed with model: {model_name}",
             "model": model_name,
-        }))
+        }
     except ImportError as e:
-        print(json.dumps({
+        return {
             "error": f"Required package not installed: {e}. "
                      f"Install with: pip install torch torchaudio"
-        }))
-        sys.exit(1)
+        }
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+        return {"error": str(e)}
 
 
 def process_deepafx(input_path, output_path, reference, bit_depth, target_lufs):
@@ -67,8 +79,9 @@ def process_deepafx(input_path, output_path, reference, bit_depth, target_lufs):
     """
     import numpy as np
     import soundfile as sf
+    from loudness import DB_TO_LIN, SILENCE_LUFS
 
-    audio, sr = sf.read(input_path, always_2d=True)
+    audio, sr = _read(input_path)
 
     # Try loading DeepAFx-ST
     try:
@@ -84,24 +97,21 @@ def process_deepafx(input_path, output_path, reference, bit_depth, target_lufs):
             "Install from: https://github.com/adobe-research/DeepAFx-ST\n"
         )
 
-    # Fallback: basic processing with loudness normalization
-    processed = audio.copy()
-
-    # Loudness normalization
-    rms = np.sqrt(np.mean(processed ** 2))
-    if rms > 1e-10:
-        current_db = 20 * np.log10(rms)
-        current_lufs = current_db - 0.691
+    # Fallback: basic loudness normalization, in place on the freshly
+    # decoded buffer (it isn't needed afterwards)
+    current_lufs, peak = _measure(audio, sr)
+    gain_linear = 1.0
+    if current_lufs > SILENCE_LUFS:
         gain_db = np.clip(target_lufs - current_lufs, -12.0, 12.0)
-        processed *= 10 ** (gain_db / 20.0)
+        gain_linear = math.exp(gain_db * DB_TO_LIN)
 
-    # Simple peak limiter
-    peak = np.max(np.abs(processed))
-    ceiling = 10 ** (-1.0 / 20.0)
-    if peak > ceiling:
-        processed *= ceiling / peak
+    # Simple peak limiter, folded into the same gain
+    ceiling = math.exp(-1.0 * DB_TO_LIN)
+    if peak * gain_linear > ceiling:
+        gain_linear = ceiling / peak
+    audio *= gain_linear
 
-    sf.write(output_path, processed, sr, subtype=_subtype(bit_depth))
+    sf.write(output_path, audio, sr, subtype=_subtype(bit_depth))
 
 
 def process_huggingface(input_path, output_path, model_name, bit_depth, target_lufs):
@@ -111,29 +121,66 @@ def process_huggingface(input_path, output_path, model_name, bit_depth, target_l
     """
     import numpy as np
     import soundfile as sf
+    from loudness import DB_TO_LIN, SILENCE_LUFS
 
     sys.stderr.write(
         f"[ml_inference] HuggingFace model '{model_name}' integration is experimental.\n"
         f"Applying basic loudness normalization as fallback.\n"
     )
 
-    audio, sr = sf.read(input_path, always_2d=True)
-    processed = audio.copy()
+    # Scaled in place: the decoded buffer isn't needed afterwards
+    audio, sr = _read(input_path)
 
     # Basic loudness normalization
-    rms = np.sqrt(np.mean(processed ** 2))
-    if rms > 1e-10:
-        current_db = 20 * np.log10(rms)
-        current_lufs = current_db - 0.691
+    current_lufs, peak = _measure(audio, sr)
+    gain_linear = 1.0
+    if current_lufs > SILENCE_LUFS:
         gain_db = np.clip(target_lufs - current_lufs, -12.0, 12.0)
-        processed *= 10 ** (gain_db / 20.0)
+        gain_linear = math.exp(gain_db * DB_TO_LIN)
+
+    ceiling = math.exp(-1.0 * DB_TO_LIN)
+    if peak * gain_linear > ceiling:
+        gain_linear = ceiling / peak
+    audio *= gain_linear
 
-    peak = np.max(np.abs(processed))
-    ceiling = 10 ** (-1.0 / 20.0)
-    if peak > ceiling:
-        processed *= ceiling / peak
+    sf.write(output_path, audio, sr, subtype=_subtype(bit_depth))
+
+
+def _measure(audio, sr):
+    """
+    Integrated loudness (LUFS) and absolute peak of (samples, channels)
+    audio. When torch is already loaded and CUDA is available, both come
+    from a single upload of the track to the GPU, and only the two scalars
+    come back. Otherwise (or if the GPU runs out of memory) loudness.py
+    measures loudness, which is faster than the torch FIR meter on CPU and
+    avoids importing torch, and the peak is taken on the host.
+    """
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        from gpu_loudness import integrated_loudness
+
+        try:
+            # (channels, samples), uploaded once
+            tensor = torch.from_numpy(audio.T).to("cuda", non_blocking=True)
+            return integrated_loudness(tensor, sr), float(tensor.abs().max())
+        except torch.cuda.OutOfMemoryError:
+            sys.stderr.write("[ml_inference] GPU out of memory, measuring on the CPU\n")
+            tensor = None
+            torch.cuda.empty_cache()
+
+    from loudness import measure_lufs
+    return measure_lufs(audio, sr), float(max(audio.max(), -audio.min()))
+
+
+def _read(input_path):
+    """Read a file as a (samples, channels) float32 array, without a float64 copy."""
+    import numpy as np
+    import soundfile as sf
 
-    sf.write(output_path, processed, sr, subtype=_subtype(bit_depth))
+    with sf.SoundFile(input_path) as f:
+        audio = np.empty((f.frames, f.channels), dtype=np.float32)
+        f.read(out=audio)
+        return audio, f.samplerate
 
 
 def _subtype(bit_depth):